@@ -1,6 +1,9 @@
+import logging
 import random
 from mesa import Agent
 
+logger = logging.getLogger(__name__)
+
 class ParentAgent(Agent):
     def __init__(self, unique_id, model, education_level, initial_time_investment, strategy=None):
         super().__init__(unique_id, model)
@@ -67,4 +70,4 @@ class ParentAgent(Agent):
             }
             choice_weights = [strategy_ratios[strategy_map[strategy]] / total_ratio for strategy in self.model.social_learning_strategies]
             self.strategy = random.choices(list(strategy_map.keys()), weights=choice_weights, k=1)[0]
-        print(f"Agent {self.unique_id} switched to strategy {self.strategy}")
+            logger.debug("Agent %s switched to strategy %s", self.unique_id, self.strategy)
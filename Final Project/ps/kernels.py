@@ -0,0 +1,209 @@
+import importlib.util
+
+import numpy as np
+
+# numba is optional and only imported the first time its kernels are used
+BACKENDS = ["numba", "numpy"] if importlib.util.find_spec("numba") else ["numpy"]
+
+# Integer codes for the typed state columns.
+LEVEL_CODES = {"High": 0, "Medium": 1, "Low": 2}
+STRATEGIES = ["Individual Learning",
+              "Copying the highest-scoring neighbor",
+              "Copying the most frequently observed strategy",
+              "Copying randomly"]
+STRATEGY_CODES = {strategy: code for code, strategy in enumerate(STRATEGIES)}
+
+
+def resolve_backend(backend=None):
+    """
+    Return the backend to use: numba when it is installed, numpy otherwise.
+
+    Parameters:
+    backend (str, optional): "numba", "numpy" or None/"auto" for the fastest available.
+    """
+    if backend in (None, "auto"):
+        return BACKENDS[0]
+    if backend not in ("numba", "numpy"):
+        raise ValueError(f"Unknown kernel backend {backend!r}, expected 'numba' or 'numpy'.")
+    if backend not in BACKENDS:
+        raise ImportError("The numba kernel backend needs numba to be installed.")
+    return backend
+
+
+def neighbour_csr(agents, grid):
+    """
+    Build CSR neighbour arrays for agents on a network grid.
+
+    Row i lists the positions in agents of agent i's neighbours, in the order
+    returned by grid.get_neighbors.
+
+    Returns:
+    tuple: (indptr, indices) as int64 arrays.
+    """
+    # Keyed by object, since ParentalLearningModel does not give agents distinct unique_ids
+    index = {id(agent): i for i, agent in enumerate(agents)}
+    indptr = np.zeros(len(agents) + 1, dtype=np.int64)
+    indices = []
+    for i, agent in enumerate(agents):
+        neighbours = grid.get_neighbors(agent.pos, include_center=False)
+        indices.extend(index[id(neighbour)] for neighbour in neighbours)
+        indptr[i + 1] = len(indices)
+    return indptr, np.array(indices, dtype=np.int64)
+
+
+def _parent_step_loop(indptr, indices, level, strategy, time_investment, score,
+                      optimal_time_investment, thresholds, switch_probabilities, cum_weights,
+                      draws):
+    n = len(strategy)
+    next_time = time_investment.copy()
+    next_score = np.empty(n)
+    next_strategy = strategy.copy()
+    for i in range(n):
+        start, stop = indptr[i], indptr[i + 1]
+        if stop > start:
+            if strategy[i] == 1:
+                best = indices[start]
+                for k in range(start + 1, stop):
+                    if score[indices[k]] > score[best]:
+                        best = indices[k]
+                if score[best] > score[i]:
+                    next_time[i] = time_investment[best]
+            elif strategy[i] == 2:
+                # Most frequent neighbour investment, the smallest one on a tie
+                best_count = 0
+                for k in range(start, stop):
+                    value = time_investment[indices[k]]
+                    count = 0
+                    for j in range(start, stop):
+                        if time_investment[indices[j]] == value:
+                            count += 1
+                    if count > best_count or (count == best_count and value < next_time[i]):
+                        best_count = count
+                        next_time[i] = value
+            elif strategy[i] == 3:
+                offset = min(int(draws[0, i] * (stop - start)), stop - start - 1)
+                next_time[i] = time_investment[indices[start + offset]]
+
+        discrepancy = abs(next_time[i] - optimal_time_investment)
+        if discrepancy <= 5:
+            next_score[i] = 20
+        elif discrepancy <= 10:
+            next_score[i] = 10
+        else:
+            next_score[i] = 0
+
+        if discrepancy > thresholds[level[i]] and draws[1, i] < switch_probabilities[level[i]]:
+            # random.choices: bisect_right(cum_weights, x, 0, 2) over the three social strategies
+            weights = cum_weights[level[i]]
+            x = draws[2, i] * weights[2]
+            if x < weights[1]:
+                next_strategy[i] = 1 if x < weights[0] else 2
+            else:
+                next_strategy[i] = 3
+    return next_time, next_score, next_strategy
+
+
+def _segment_first_argmax(indptr, indices, values):
+    """
+    Position in indices of the first maximum of values within each non-empty row.
+    """
+    nonempty = np.diff(indptr) > 0
+    starts = indptr[:-1][nonempty]
+    gathered = values[indices]
+    row_max = np.maximum.reduceat(gathered, starts)
+    row_of = np.repeat(np.arange(len(starts)), np.diff(indptr)[nonempty])
+    candidates = np.where(gathered == row_max[row_of], np.arange(len(indices)), len(indices))
+    first = np.zeros(len(indptr) - 1, dtype=np.int64)
+    first[nonempty] = np.minimum.reduceat(candidates, starts)
+    return first
+
+
+def _segment_mode(indptr, indices, values):
+    """
+    Most frequent value of each non-empty row, the smallest one on a tie.
+    """
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    gathered = values[indices]
+    order = np.lexsort((gathered, rows))
+    rows, gathered = rows[order], gathered[order]
+    run_start = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (gathered[1:] != gathered[:-1])])
+    run_count = np.diff(np.r_[run_start, len(rows)])
+    run_row, run_value = rows[run_start], gathered[run_start]
+    # Within each row: highest count first, then smallest value
+    best = np.lexsort((run_value, -run_count, run_row))
+    first_of_row = np.r_[True, run_row[best][1:] != run_row[best][:-1]]
+    mode = np.zeros(len(indptr) - 1)
+    mode[run_row[best][first_of_row]] = run_value[best][first_of_row]
+    return mode
+
+
+def _parent_step_numpy(indptr, indices, level, strategy, time_investment, score,
+                       optimal_time_investment, thresholds, switch_probabilities, cum_weights,
+                       draws):
+    degree = np.diff(indptr)
+    has_neighbours = degree > 0
+    next_time = time_investment.copy()
+
+    best = indices[_segment_first_argmax(indptr, indices, score)]
+    highest = (strategy == 1) & has_neighbours & (score[best] > score)
+    next_time[highest] = time_investment[best[highest]]
+
+    frequent = (strategy == 2) & has_neighbours
+    if frequent.any():
+        next_time[frequent] = _segment_mode(indptr, indices, time_investment)[frequent]
+
+    copying = (strategy == 3) & has_neighbours
+    offset = np.minimum((draws[0] * degree).astype(np.int64), np.maximum(degree - 1, 0))
+    picked = indices[np.minimum(indptr[:-1] + offset, max(len(indices) - 1, 0))]
+    next_time[copying] = time_investment[picked[copying]]
+
+    discrepancy = np.abs(next_time - optimal_time_investment)
+    next_score = np.select([discrepancy <= 5, discrepancy <= 10], [20.0, 10.0], 0.0)
+
+    next_strategy = strategy.copy()
+    switching = (discrepancy > thresholds[level]) & (draws[1] < switch_probabilities[level])
+    weights = cum_weights[level]
+    x = draws[2] * weights[:, 2]
+    # random.choices: bisect_right(cum_weights, x, 0, 2) over the three social strategies
+    choice = np.where(x < weights[:, 1], np.where(x < weights[:, 0], 0, 1), 2)
+    next_strategy[switching] = 1 + choice[switching]
+    return next_time, next_score, next_strategy
+
+
+_KERNELS = {"numpy": _parent_step_numpy}
+
+
+def _kernel(backend):
+    backend = resolve_backend(backend)
+    if backend not in _KERNELS:
+        from numba import njit
+
+        _KERNELS[backend] = njit(cache=True)(_parent_step_loop)
+    return _KERNELS[backend]
+
+
+def parent_step(indptr, indices, level, strategy, time_investment, score,
+                optimal_time_investment, thresholds, switch_probabilities, cum_weights, draws,
+                backend=None):
+    """
+    Apply ParentAgent.step to every agent at once from the previous step's state.
+
+    Parameters:
+    indptr, indices (ndarray): CSR neighbours.
+    level (ndarray): Education level codes, see LEVEL_CODES.
+    strategy (ndarray): Strategy codes, see STRATEGY_CODES.
+    time_investment, score (ndarray): Current time investments and child outcome scores.
+    optimal_time_investment (float): The model's optimal time investment.
+    thresholds, switch_probabilities (ndarray): Discrepancy threshold and switch
+        probability for each education level.
+    cum_weights (ndarray): Cumulative social strategy weights, one row per education level.
+    draws (ndarray): Uniform [0, 1) draws of shape (3, n) for random copying, switching
+        and the choice of the new strategy.
+    backend (str, optional): See resolve_backend.
+
+    Returns:
+    tuple: The next time investments, scores and strategy codes.
+    """
+    return _kernel(backend)(indptr, indices, level, strategy, time_investment, score,
+                            float(optimal_time_investment), thresholds, switch_probabilities,
+                            cum_weights, draws)
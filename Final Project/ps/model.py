@@ -1,14 +1,70 @@
 import logging
 import networkx as nx
 import mesa
+import numpy as np
+from itertools import accumulate
 from mesa.datacollection import DataCollector
+from . import kernels
 from .agent import ParentAgent
 import random
 
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+
+class KernelActivation(mesa.time.BaseScheduler):
+    """
+    Update all agents synchronously with the compiled or NumPy kernels in kernels.py.
+
+    Every agent applies ParentAgent.step to the previous step's time investments and
+    scores instead of agents updating one at a time in random order.
+    """
+
+    def __init__(self, model, backend=None):
+        super().__init__(model)
+        self.backend = kernels.resolve_backend(backend)
+        self.rng = np.random.default_rng(model.random.getrandbits(64))
+        self.columns = None
+
+    def build_columns(self):
+        """Neighbour arrays and per-level parameters, built once the model is set up."""
+        model = self.model
+        agents = list(self.agents)
+        levels = list(kernels.LEVEL_CODES)
+        cum_weights = []
+        for level in levels:
+            ratios = getattr(model, f"{level.lower()}_social_strategy_ratios")
+            weights = [ratios[key] for key in ("highest", "most_frequent", "random")]
+            cum_weights.append(list(accumulate(weight / sum(weights) for weight in weights)))
+        self.columns = {
+            "agents": agents,
+            "neighbours": kernels.neighbour_csr(agents, model.grid),
+            "level": np.array([kernels.LEVEL_CODES[a.education_level] for a in agents], dtype=np.int8),
+            "thresholds": np.array([model.discrepancy_thresholds[level] for level in levels], dtype=np.float64),
+            "switch_probabilities": np.array([model.switch_probabilities[level] for level in levels]),
+            "cum_weights": np.array(cum_weights),
+        }
+
+    def step(self):
+        if self.columns is None:
+            self.build_columns()
+        columns = self.columns
+        agents = columns["agents"]
+        time_investment, score, strategy = kernels.parent_step(
+            *columns["neighbours"], columns["level"],
+            np.array([kernels.STRATEGY_CODES[a.strategy] for a in agents], dtype=np.int8),
+            np.array([a.time_investment for a in agents], dtype=np.float64),
+            np.array([a.child_outcome_score for a in agents], dtype=np.float64),
+            self.model.optimal_time_investment, columns["thresholds"],
+            columns["switch_probabilities"], columns["cum_weights"],
+            self.rng.random((3, len(agents))), self.backend)
+        for agent, t, s, code in zip(agents, time_investment, score, strategy):
+            agent.time_investment = float(t)
+            agent.child_outcome_score = float(s)
+            agent.strategy = kernels.STRATEGIES[code]
+        self.steps += 1
+        self.time += 1
+
 class ParentalLearningModel(mesa.Model):
     def __init__(self, initial_density=0.8, width=50, height=50,  # Include initial_density
                  optimal_time_investment=40,
@@ -24,7 +80,8 @@ class ParentalLearningModel(mesa.Model):
                  initial_time_investment=30,
                  high_discrepancy_threshold=5, medium_discrepancy_threshold=10, low_discrepancy_threshold=15,
                  high_switch_probability=0.1, medium_switch_probability=0.3, low_switch_probability=0.5,
-                 max_attempts=2000):
+                 max_attempts=2000,
+                 kernel_backend=None):
         super().__init__()
         logger.debug("Initializing the model...")
 
@@ -71,7 +128,11 @@ class ParentalLearningModel(mesa.Model):
         self.G = combined_network  # Assign the combined network to self.G
         logger.debug("Network grid initialized.")
 
-        self.schedule = mesa.time.RandomActivation(self)
+        # kernel_backend ('numba', 'numpy' or 'auto') switches to synchronous kernel updates
+        if kernel_backend is None:
+            self.schedule = mesa.time.RandomActivation(self)
+        else:
+            self.schedule = KernelActivation(self, kernel_backend)
         self.optimal_time_investment = optimal_time_investment
 
         self.set_social_learning_ratios("High", high_individual_learning_ratio, high_primary_social_ratio, high_primary_social_strategy)
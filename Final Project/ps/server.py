@@ -6,7 +6,6 @@ from mesa.visualization.UserParam import Choice, Slider
 from .model import ParentalLearningModel 
 
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 logger.debug("Starting server setup...")
@@ -1,3 +1,7 @@
+import logging
+
+logging.basicConfig(level=logging.DEBUG)
+
 from ps.server import server
 
 server.launch(open_browser=True)
@@ -1,7 +1,5 @@
-from pd_grid.model import PdGrid
-from mesa.batchrunner import batch_run
+from pd_grid.sweep import SweepPool
 import numpy as np
-import pandas as pd
 
 # Define ranges for payoff values
 payoff_CC_range = np.arange(0, 6, 1)  # From 0 to 5 inclusive, spaced by 1
@@ -28,18 +26,27 @@ parameters = {
 
 # The main block to avoid multiprocessing issues
 if __name__ == '__main__':
-    # Run the batch simulation
-    results = batch_run(
-        model_cls=PdGrid,
-        parameters=parameters,
-        iterations=30,
-        max_steps=50,
-        data_collection_period=5,
-        number_processes=4
-    )
+    import pandas as pd
+    from pd_grid.summary import summarize
+
+    max_steps = 50
+    data_collection_period = 5
+
+    # Run the batch simulation; each worker imports the model once and is reused for every run
+    with SweepPool(
+        model_path="pd_grid.model:PdGrid",
+        number_processes=4,
+        max_steps=max_steps,
+        data_collection_period=data_collection_period
+    ) as pool:
+        results = pool.run(parameters, iterations=30)
 
     # Convert results to pandas DataFrame
     df = pd.DataFrame(results)
 
     # Save the data to a CSV file
     df.to_csv("batch_run_results_2.csv")
+
+    # Write the per-cell summary tables used by the analysis notebooks
+    summarize(df, "batch_run_summary", max_steps=max_steps,
+              data_collection_period=data_collection_period)
@@ -0,0 +1,273 @@
+import importlib.util
+
+import numpy as np
+
+# numba is optional and only imported the first time its kernels are used
+BACKENDS = ["numba", "numpy"] if importlib.util.find_spec("numba") else ["numpy"]
+
+# Integer codes for the typed state columns.
+STRATEGY_CODES = {"Frequency Dependent Learning": 0, "Success Base Learning": 1, "Random Copying": 2}
+MOVE_CODES = {"D": 0, "C": 1}
+
+# Model reporter names shared by PdGrid and ParallelPdGrid, in column order:
+# agents and average score of each strategy, then the agents making each move.
+COUNT_REPORTERS = {
+    "Frequency Dependent Learning": "Frequency Dependent Agents",
+    "Success Base Learning": "Success Base Agents",
+    "Random Copying": "Random Copying Agents",
+}
+SCORE_REPORTERS = {
+    "Frequency Dependent Learning": "Average Score(Frequency Dependent)",
+    "Success Base Learning": "Average Score(Success Base)",
+    "Random Copying": "Average Score(Random Copying)",
+}
+MOVE_REPORTERS = {"D": "Defecting Agents", "C": "Cooperating Agents"}
+REPORTER_NAMES = [*COUNT_REPORTERS.values(), *SCORE_REPORTERS.values(), *MOVE_REPORTERS.values()]
+
+# Mesa's Moore neighbourhood order as (dx, dy): x outermost, centre 5th.
+NEIGHBOURHOOD = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+CENTER = NEIGHBOURHOOD.index((0, 0))
+
+
+def resolve_backend(backend=None):
+    """
+    Return the backend to use: numba when it is installed, numpy otherwise.
+
+    Parameters:
+    backend (str, optional): "numba", "numpy" or None/"auto" for the fastest available.
+    """
+    if backend in (None, "auto"):
+        return BACKENDS[0]
+    if backend not in ("numba", "numpy"):
+        raise ValueError(f"Unknown kernel backend {backend!r}, expected 'numba' or 'numpy'.")
+    if backend not in BACKENDS:
+        raise ImportError("The numba kernel backend needs numba to be installed.")
+    return backend
+
+
+def strategy_ratios(primary_ratio, primary_strategy):
+    """
+    Share of the population using each strategy.
+
+    Parameters:
+    primary_ratio (float): Share of the primary strategy. The other two split the rest evenly.
+    primary_strategy (str): One of the strategies in STRATEGY_CODES.
+
+    Returns:
+    dict: The ratio of each strategy, in STRATEGY_CODES order.
+    """
+    if primary_strategy not in STRATEGY_CODES:
+        raise ValueError(f"Unknown primary strategy {primary_strategy!r}, "
+                         f"expected one of {list(STRATEGY_CODES)}.")
+    remaining_ratio = (1 - primary_ratio) / 2
+    return {strategy: primary_ratio if strategy == primary_strategy else remaining_ratio
+            for strategy in STRATEGY_CODES}
+
+
+def strategy_counts(num_agents, primary_ratio, primary_strategy):
+    """
+    Number of agents using each strategy, see strategy_ratios.
+
+    Every count is rounded down except Random Copying's, which takes the remainder.
+
+    Returns:
+    dict: The number of agents of each strategy, in STRATEGY_CODES order.
+    """
+    ratios = strategy_ratios(primary_ratio, primary_strategy)
+    counts = {strategy: int(num_agents * ratio) for strategy, ratio in ratios.items()}
+    counts["Random Copying"] = num_agents - counts["Frequency Dependent Learning"] - counts["Success Base Learning"]
+    return counts
+
+
+def neighbour_csr(agents, grid):
+    """
+    Build CSR neighbourhood arrays for agents on a torus grid.
+
+    Row i lists the positions in agents of agent i's Moore neighbourhood, centre
+    included, in the order returned by grid.get_neighbors (see NEIGHBOURHOOD).
+
+    Returns:
+    tuple: (indptr, indices) as int64 arrays.
+    """
+    index = {agent.unique_id: i for i, agent in enumerate(agents)}
+    indptr = np.zeros(len(agents) + 1, dtype=np.int64)
+    indices = []
+    for i, agent in enumerate(agents):
+        neighbours = grid.get_neighbors(agent.pos, moore=True, include_center=True)
+        indices.extend(index[neighbour.unique_id] for neighbour in neighbours)
+        indptr[i + 1] = len(indices)
+    return indptr, np.array(indices, dtype=np.int64)
+
+
+def apply_rules(strategy, moves, neighbourhood_moves, neighbourhood_scores, draws):
+    """
+    Apply every agent's learning rule to the previous step's state.
+
+    This is the single NumPy definition of the rules, shared by the kernels below
+    and by the strip workers in parallel.py. Ties follow PDAgent: success base
+    learning copies the first best agent in mesa's neighbourhood order.
+
+    Parameters:
+    strategy (ndarray): Strategy codes, see STRATEGY_CODES.
+    moves (ndarray): Current moves (1 = C, 0 = D).
+    neighbourhood_moves, neighbourhood_scores (ndarray): Moves and scores stacked
+        along a leading axis in NEIGHBOURHOOD order, centre included.
+    draws (ndarray): One uniform [0, 1) draw per agent for tie-breaks and random copying.
+
+    Returns:
+    ndarray: The next moves.
+    """
+    degree = len(NEIGHBOURHOOD) - 1
+    cooperators = neighbourhood_moves.sum(axis=0, dtype=np.int64) - moves
+
+    # Frequency dependent learning: majority of neighbours, random on a tie.
+    majority = np.where(2 * cooperators > degree, 1, 0)
+    ties = 2 * cooperators == degree
+    majority[ties] = draws[ties] < 0.5
+
+    # Success base learning: copy the first best of the neighbourhood, centre included.
+    best = neighbourhood_scores.argmax(axis=0)[np.newaxis]
+    success = np.take_along_axis(neighbourhood_moves, best, axis=0)[0]
+
+    # Random copying: copy one of the neighbours, skipping the centre.
+    picked = np.minimum((draws * degree).astype(np.int64), degree - 1)
+    picked = (picked + (picked >= CENTER))[np.newaxis]
+    copied = np.take_along_axis(neighbourhood_moves, picked, axis=0)[0]
+
+    return np.select([strategy == 0, strategy == 1], [majority, success], copied).astype(moves.dtype)
+
+
+def apply_payoffs(moves, neighbourhood_moves, payoff_matrix):
+    """
+    Payoff collected by every agent against its neighbours.
+
+    Parameters:
+    moves (ndarray): Moves after this step's update.
+    neighbourhood_moves (ndarray): The same moves stacked in NEIGHBOURHOOD order.
+    payoff_matrix (tuple): Payoffs (CC, CD, DC, DD) as seen by the focal agent.
+    """
+    payoff_CC, payoff_CD, payoff_DC, payoff_DD = payoff_matrix
+    cooperators = neighbourhood_moves.sum(axis=0, dtype=np.int64) - moves
+    defectors = len(NEIGHBOURHOOD) - 1 - cooperators
+    return np.where(moves == 1,
+                    cooperators * payoff_CC + defectors * payoff_CD,
+                    cooperators * payoff_DC + defectors * payoff_DD)
+
+
+def _dense(indptr, indices):
+    """
+    CSR neighbourhoods as a (9, n) stack; every row must be a full Moore neighbourhood.
+    """
+    n = len(indptr) - 1
+    if len(indices) != n * len(NEIGHBOURHOOD) or np.any(np.diff(indptr) != len(NEIGHBOURHOOD)):
+        raise ValueError("The numpy backend needs a full Moore neighbourhood for every agent.")
+    return indices.reshape(n, len(NEIGHBOURHOOD)).T
+
+
+def _next_moves_numpy(indptr, indices, strategy, moves, scores, draws):
+    neighbourhood = _dense(indptr, indices)
+    return apply_rules(strategy, moves, moves[neighbourhood], scores[neighbourhood], draws)
+
+
+def _payoffs_numpy(indptr, indices, moves, payoff_matrix):
+    return apply_payoffs(moves, moves[_dense(indptr, indices)], payoff_matrix)
+
+
+def _next_moves_loop(indptr, indices, strategy, moves, scores, draws):
+    n = len(strategy)
+    next_moves = np.empty(n, dtype=moves.dtype)
+    for i in range(n):
+        start, stop = indptr[i], indptr[i + 1]
+        degree = stop - start - 1
+        if strategy[i] == 0:
+            cooperators = 0
+            for k in range(start, stop):
+                if indices[k] != i:
+                    cooperators += moves[indices[k]]
+            if 2 * cooperators > degree:
+                next_moves[i] = 1
+            elif 2 * cooperators < degree:
+                next_moves[i] = 0
+            else:
+                next_moves[i] = 1 if draws[i] < 0.5 else 0
+        elif strategy[i] == 1:
+            best = indices[start]
+            for k in range(start + 1, stop):
+                if scores[indices[k]] > scores[best]:
+                    best = indices[k]
+            next_moves[i] = moves[best]
+        else:
+            # The picked-th neighbour, skipping the centre
+            picked = min(int(draws[i] * degree), degree - 1)
+            for k in range(start, stop):
+                if indices[k] == i:
+                    continue
+                if picked == 0:
+                    next_moves[i] = moves[indices[k]]
+                    break
+                picked -= 1
+    return next_moves
+
+
+def _payoffs_loop(indptr, indices, moves, payoff_matrix):
+    n = len(moves)
+    payoffs = np.zeros(n)
+    for i in range(n):
+        cooperators = 0
+        for k in range(indptr[i], indptr[i + 1]):
+            if indices[k] != i:
+                cooperators += moves[indices[k]]
+        defectors = indptr[i + 1] - indptr[i] - 1 - cooperators
+        if moves[i] == 1:
+            payoffs[i] = cooperators * payoff_matrix[0] + defectors * payoff_matrix[1]
+        else:
+            payoffs[i] = cooperators * payoff_matrix[2] + defectors * payoff_matrix[3]
+    return payoffs
+
+
+_KERNELS = {"numpy": (_next_moves_numpy, _payoffs_numpy)}
+
+
+def _kernels(backend):
+    backend = resolve_backend(backend)
+    if backend not in _KERNELS:
+        from numba import njit
+
+        _KERNELS[backend] = (njit(cache=True)(_next_moves_loop), njit(cache=True)(_payoffs_loop))
+    return _KERNELS[backend]
+
+
+def next_moves(indptr, indices, strategy, moves, scores, draws, backend=None):
+    """
+    Apply every agent's learning rule at once to the current moves and scores.
+
+    Parameters:
+    indptr, indices (ndarray): CSR neighbourhoods from neighbour_csr, centre included.
+    strategy (ndarray): Strategy codes, see STRATEGY_CODES.
+    moves (ndarray): Current moves (1 = C, 0 = D).
+    scores (ndarray): Current cumulative scores.
+    draws (ndarray): One uniform [0, 1) draw per agent for tie-breaks and random copying.
+    backend (str, optional): See resolve_backend.
+
+    Returns:
+    ndarray: The next moves.
+    """
+    kernel = _kernels(backend)[0]
+    return kernel(indptr, indices, strategy, moves, scores, draws)
+
+
+def payoffs(indptr, indices, moves, payoff_matrix, backend=None):
+    """
+    Payoff collected by every agent against its neighbours.
+
+    Parameters:
+    indptr, indices (ndarray): CSR neighbourhoods from neighbour_csr, centre included.
+    moves (ndarray): Moves after this step's update.
+    payoff_matrix (tuple): Payoffs (CC, CD, DC, DD) as seen by the focal agent.
+    backend (str, optional): See resolve_backend.
+
+    Returns:
+    ndarray: The payoff of every agent.
+    """
+    kernel = _kernels(backend)[1]
+    return kernel(indptr, indices, moves, np.asarray(payoff_matrix, dtype=np.float64))
@@ -1,39 +1,84 @@
 import mesa
+import numpy as np
+from . import kernels
 from .agent import PDAgent
 from mesa.datacollection import DataCollector
 
+
+class KernelActivation(mesa.time.BaseScheduler):
+    """
+    Update all agents synchronously with the compiled or NumPy kernels in kernels.py.
+
+    Every agent applies its learning rule to the previous step's moves and scores,
+    then collects its payoff against the new moves of its neighbours.
+    """
+
+    def __init__(self, model, backend=None):
+        super().__init__(model)
+        self.backend = kernels.resolve_backend(backend)
+        self.rng = np.random.default_rng(model.random.getrandbits(64))
+        self.columns = None
+
+    def build_columns(self):
+        """Neighbour arrays and strategy codes, built once the agents are placed."""
+        agents = list(self.agents)
+        self.columns = {
+            "agents": agents,
+            "neighbourhood": kernels.neighbour_csr(agents, self.model.grid),
+            "strategy": np.array([kernels.STRATEGY_CODES[a.strategy] for a in agents], dtype=np.int8),
+        }
+
+    def step(self):
+        if self.columns is None:
+            self.build_columns()
+        agents = self.columns["agents"]
+        moves = np.array([kernels.MOVE_CODES[a.move] for a in agents], dtype=np.int8)
+        scores = np.array([a.score for a in agents], dtype=np.float64)
+        moves = kernels.next_moves(
+            *self.columns["neighbourhood"], self.columns["strategy"],
+            moves, scores, self.rng.random(len(agents)), self.backend)
+        payoffs = kernels.payoffs(
+            *self.columns["neighbourhood"], moves, tuple(self.model.payoff_matrix.values()), self.backend)
+        for agent, move, payoff in zip(agents, moves, payoffs):
+            agent.move = "C" if move else "D"
+            agent.score += payoff
+        self.steps += 1
+        self.time += 1
+
+
 class PdGrid(mesa.Model):
     def __init__(self, initial_cooperate_prob=0.5, 
                  payoff_CC=1, payoff_CD=0, payoff_DC=2, payoff_DD=0,
                  primary_ratio=0.333, primary_strategy="Frequency Dependent Learning",
                  width = 50,
-                 height = 50):
+                 height = 50,
+                 kernel_backend=None):
         """
         Initializes the Prisoner's Dilemma grid model with specified agent ratios.
 
         Parameters:
         primary_ratio (float): Determines the ratio of different strategies in the population.
         primary_strategy (str): Can be 'Frequency Dependent Learning', 'Success Base Learning', or 'Random Copying'.
+        kernel_backend (str, optional): Update agents synchronously with the 'numba' or 'numpy'
+            kernels ('auto' picks numba when installed). Defaults to None, the agent-by-agent update.
         """    
         super().__init__()
         width = 50
         height = 50
         self.grid = mesa.space.SingleGrid(width, height, torus=True)
-        self.schedule = mesa.time.SimultaneousActivation(self)
+        if kernel_backend is None:
+            self.schedule = mesa.time.SimultaneousActivation(self)
+        else:
+            self.schedule = KernelActivation(self, kernel_backend)
         self.initial_cooperate_prob = initial_cooperate_prob
         self.set_ratios_by_choice(primary_ratio, primary_strategy)
 
         # Determine the number of agents for each strategy
-        num_agents = width * height
-        num_frequency_dependent = int(num_agents * self.frequency_dependent_ratio)
-        num_success_base = int(num_agents * self.success_base_ratio)
-        num_random = num_agents - (num_frequency_dependent + num_success_base)
+        counts = kernels.strategy_counts(width * height, primary_ratio, primary_strategy)
 
         # Create and place agents
         agent_id = 0
-        for strategy, count in [("Frequency Dependent Learning", num_frequency_dependent),
-                                ("Success Base Learning", num_success_base),
-                                ("Random Copying", num_random)]:
+        for strategy, count in counts.items():
             for _ in range(count):
                 x = self.random.randrange(width)
                 y = self.random.randrange(height)
@@ -55,18 +100,15 @@ class PdGrid(mesa.Model):
             ('D', 'D'): payoff_DD   
         }       
 
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Frequency Dependent Agents": lambda m: len([a for a in m.schedule.agents if a.strategy == "Frequency Dependent Learning"]),
-                "Success Base Agents": lambda m: len([a for a in m.schedule.agents if a.strategy == "Success Base Learning"]),
-                "Random Copying Agents": lambda m: len([a for a in m.schedule.agents if a.strategy == "Random Copying"]),
-                "Average Score(Frequency Dependent)": lambda m: self.average_score_by_strategy("Frequency Dependent Learning"),
-                "Average Score(Success Base)": lambda m: self.average_score_by_strategy("Success Base Learning"),
-                "Average Score(Random Copying)": lambda m: self.average_score_by_strategy("Random Copying"),
-                "Defecting Agents": lambda m: len([a for a in m.schedule.agents if a.move == "D"]),
-                "Cooperating Agents": lambda m: len([a for a in m.schedule.agents if a.move == "C"]),
-            }
-            )
+        # Reporter names and order are shared with ParallelPdGrid, see kernels.REPORTER_NAMES
+        model_reporters = {}
+        for strategy, name in kernels.COUNT_REPORTERS.items():
+            model_reporters[name] = lambda m, s=strategy: len([a for a in m.schedule.agents if a.strategy == s])
+        for strategy, name in kernels.SCORE_REPORTERS.items():
+            model_reporters[name] = lambda m, s=strategy: m.average_score_by_strategy(s)
+        for move, name in kernels.MOVE_REPORTERS.items():
+            model_reporters[name] = lambda m, mv=move: len([a for a in m.schedule.agents if a.move == mv])
+        self.datacollector = DataCollector(model_reporters=model_reporters)
 
         self.running = True
         self.datacollector.collect(self)
@@ -99,19 +141,10 @@ class PdGrid(mesa.Model):
             return 0
 
     def set_ratios_by_choice(self, primary_ratio, primary_strategy):
-        remaining_ratio = (1 - primary_ratio) / 2
-        if primary_strategy == "Frequency Dependent Learning":
-            self.frequency_dependent_ratio = primary_ratio
-            self.success_base_ratio = remaining_ratio
-            self.random_ratio = remaining_ratio
-        elif primary_strategy == "Success Base Learning":
-            self.success_base_ratio = primary_ratio
-            self.frequency_dependent_ratio = remaining_ratio
-            self.random_ratio = remaining_ratio
-        elif primary_strategy == "Random Copying":
-            self.random_ratio = primary_ratio
-            self.frequency_dependent_ratio = remaining_ratio
-            self.success_base_ratio = remaining_ratio
+        ratios = kernels.strategy_ratios(primary_ratio, primary_strategy)
+        self.frequency_dependent_ratio = ratios["Frequency Dependent Learning"]
+        self.success_base_ratio = ratios["Success Base Learning"]
+        self.random_ratio = ratios["Random Copying"]
 
     def step(self):
         self.schedule.step()  
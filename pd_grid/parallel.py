@@ -0,0 +1,397 @@
+import multiprocessing as mp
+import threading
+import weakref
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+
+from .kernels import (NEIGHBOURHOOD, REPORTER_NAMES, STRATEGY_CODES, apply_payoffs, apply_rules,
+                      strategy_counts)
+
+# Integer codes for the lattice state arrays, as in kernels.STRATEGY_CODES.
+FREQUENCY_DEPENDENT, SUCCESS_BASE, RANDOM_COPYING = 0, 1, 2
+STRATEGIES = list(STRATEGY_CODES)
+
+# Per-strip partial sums written by the workers each step:
+# agent count and score sum for each strategy, then the number of cooperators.
+N_PARTIALS = 2 * len(STRATEGIES) + 1
+
+_RUN, _STOP = 0, 1
+
+# Seconds close() waits for the workers before terminating them.
+_SHUTDOWN_TIMEOUT = 10
+
+
+def _with_halo(array, start, stop):
+    """
+    Copy rows [start, stop) of a torus array plus one halo row above and below.
+
+    Returns an array of shape (stop - start + 2, width).
+    """
+    height = array.shape[0]
+    rows = np.arange(start - 1, stop + 1) % height
+    return array[rows]
+
+
+def _neighbourhood_stack(padded):
+    """
+    Stack the Moore neighbourhood of every interior cell of a halo-padded strip.
+
+    Arrays are indexed [y, x]; the stack follows kernels.NEIGHBOURHOOD, centre included.
+
+    Returns an array of shape (9, strip_height, width).
+    """
+    strip_height = padded.shape[0] - 2
+    return np.stack([
+        np.roll(padded, -dx, axis=1)[1 + dy:1 + dy + strip_height]
+        for dx, dy in NEIGHBOURHOOD
+    ])
+
+
+def update_moves(moves, scores, strategy, start, stop, rng):
+    """
+    Compute the next moves for rows [start, stop) from the current lattice state.
+
+    Every cell reads only the current moves and scores, so all strips can be
+    updated at the same time (synchronous update). The rules are kernels.apply_rules.
+
+    Parameters:
+    moves (ndarray): Current moves of the whole lattice (1 = C, 0 = D).
+    scores (ndarray): Current cumulative scores of the whole lattice.
+    strategy (ndarray): Strategy codes of the whole lattice.
+    start, stop (int): Rows owned by this strip.
+    rng (Generator): Random generator owned by this strip.
+
+    Returns:
+    ndarray: The next moves for rows [start, stop).
+    """
+    own_moves = moves[start:stop]
+    return apply_rules(
+        strategy[start:stop], own_moves,
+        _neighbourhood_stack(_with_halo(moves, start, stop)),
+        _neighbourhood_stack(_with_halo(scores, start, stop)),
+        rng.random(own_moves.shape))
+
+
+def payoffs(moves, start, stop, payoff_matrix):
+    """
+    Compute the payoff collected this step by every agent in rows [start, stop).
+
+    Parameters:
+    moves (ndarray): Moves of the whole lattice after this step's update.
+    start, stop (int): Rows owned by this strip.
+    payoff_matrix (tuple): Payoffs (CC, CD, DC, DD) as seen by the focal agent.
+
+    Returns:
+    ndarray: The payoffs for rows [start, stop).
+    """
+    return apply_payoffs(moves[start:stop], _neighbourhood_stack(_with_halo(moves, start, stop)),
+                         payoff_matrix)
+
+
+def strip_partials(moves, scores, strategy, start, stop):
+    """
+    Partial reporter sums for rows [start, stop); see N_PARTIALS for the layout.
+    """
+    own_strategy = strategy[start:stop]
+    own_scores = scores[start:stop]
+    partials = np.empty(N_PARTIALS)
+    for code in range(len(STRATEGIES)):
+        mask = own_strategy == code
+        partials[code] = mask.sum()
+        partials[len(STRATEGIES) + code] = own_scores[mask].sum()
+    partials[-1] = moves[start:stop].sum()
+    return partials
+
+
+def strip_bounds(height, n_strips):
+    """
+    Split height rows into n_strips contiguous horizontal strips.
+
+    Returns:
+    list: (start, stop) row bounds for each strip.
+    """
+    edges = np.linspace(0, height, n_strips + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+class _SharedState:
+    """
+    Lattice arrays held in shared memory.
+
+    Moves and scores are double buffered: step t reads buffer t % 2 and writes
+    buffer (t + 1) % 2, so no strip ever overwrites a row another strip still reads.
+    """
+
+    def __init__(self, width, height, n_strips, names=None):
+        shapes = {
+            "moves": ((2, height, width), np.int8),
+            "scores": ((2, height, width), np.float64),
+            "strategy": ((height, width), np.int8),
+            "partials": ((n_strips, N_PARTIALS), np.float64),
+        }
+        self.owner = names is None
+        self.blocks = {}
+        for key, (shape, dtype) in shapes.items():
+            if self.owner:
+                size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = block
+            setattr(self, key, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+    @property
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self):
+        # Drop the array views first so the buffers can be released.
+        for key in self.blocks:
+            setattr(self, key, None)
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+
+
+def _move_phase(state, t, start, stop, rng):
+    current, following = t % 2, (t + 1) % 2
+    state.moves[following, start:stop] = update_moves(
+        state.moves[current], state.scores[current], state.strategy, start, stop, rng)
+
+
+def _payoff_phase(state, t, index, start, stop, payoff_matrix):
+    current, following = t % 2, (t + 1) % 2
+    state.scores[following, start:stop] = (
+        state.scores[current, start:stop]
+        + payoffs(state.moves[following], start, stop, payoff_matrix))
+    state.partials[index] = strip_partials(
+        state.moves[following], state.scores[following], state.strategy, start, stop)
+
+
+def _strip_worker(names, shape, n_strips, index, bounds, seed, payoff_matrix,
+                  command, clock, start_barrier, move_barrier, done_barrier):
+    """
+    Worker process owning a single strip. Loops until told to stop.
+
+    On any error the barriers are aborted, so the other workers and the parent
+    get a BrokenBarrierError instead of waiting forever.
+    """
+    height, width = shape
+    state = None
+    start, stop = bounds
+    try:
+        state = _SharedState(width, height, n_strips, names)
+        rng = np.random.default_rng(seed)
+        while True:
+            start_barrier.wait()
+            if command.value == _STOP:
+                break
+            t = clock.value
+            _move_phase(state, t, start, stop, rng)
+            # The payoff phase reads the new moves in the neighbouring strips' edge rows.
+            move_barrier.wait()
+            _payoff_phase(state, t, index, start, stop, payoff_matrix)
+            done_barrier.wait()
+    except BaseException:
+        for barrier in (start_barrier, move_barrier, done_barrier):
+            barrier.abort()
+        raise
+    finally:
+        if state is not None:
+            state.close()
+
+
+def _watch_workers(workers, barriers, stopping):
+    """
+    Abort the barriers if a worker exits, e.g. killed, before close() stops it.
+    """
+    connection.wait([worker.sentinel for worker in workers])
+    if not stopping.is_set():
+        for barrier in barriers:
+            barrier.abort()
+
+
+def _shutdown(state, workers, sync, stopping):
+    """
+    Stop the workers and release the shared memory. Runs once, from close() or
+    when the model is garbage collected.
+    """
+    stopping.set()
+    if workers:
+        sync["command"].value = _STOP
+        try:
+            sync["start_barrier"].wait(_SHUTDOWN_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+        for worker in workers:
+            worker.join(_SHUTDOWN_TIMEOUT)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+    state.close()
+
+
+class ParallelPdGrid:
+    def __init__(self, initial_cooperate_prob=0.5,
+                 payoff_CC=1, payoff_CD=0, payoff_DC=2, payoff_DD=0,
+                 primary_ratio=0.333, primary_strategy="Frequency Dependent Learning",
+                 width=50,
+                 height=50,
+                 n_strips=4,
+                 processes=True,
+                 seed=None):
+        """
+        Array-based Prisoner's Dilemma lattice split into horizontal strips.
+
+        Each strip is updated by its own worker process from shared memory, with a
+        one-row halo read from the neighbouring strips per phase. Agents update
+        synchronously: every new move is computed from the previous step's moves
+        and scores. Reporters use the same names as PdGrid and are reduced across
+        strips after each step.
+
+        Parameters:
+        initial_cooperate_prob, payoff_*, primary_ratio, primary_strategy: As in PdGrid.
+        width, height (int): Size of the torus.
+        n_strips (int): Number of horizontal strips, at most height. Each strip has
+            its own random generator, so the run depends on n_strips.
+        processes (bool): Run one worker process per strip. If False, the strips
+            are stepped one after another in this process with identical results.
+        seed (int, optional): Seed for the initial state and the per-strip generators.
+        """
+        if not 1 <= n_strips <= height:
+            raise ValueError(f"n_strips must be between 1 and {height}, got {n_strips}.")
+        self.width = width
+        self.height = height
+        self.n_strips = n_strips
+        self.bounds = strip_bounds(height, n_strips)
+        self.payoff_matrix = (payoff_CC, payoff_CD, payoff_DC, payoff_DD)
+        self.steps = 0
+
+        seeds = np.random.SeedSequence(seed).spawn(n_strips + 1)
+        rng = np.random.default_rng(seeds[0])
+        counts = strategy_counts(width * height, primary_ratio, primary_strategy)
+        labels = np.repeat(np.array([STRATEGY_CODES[s] for s in counts], dtype=np.int8),
+                           list(counts.values()))
+
+        self.state = _SharedState(width, height, n_strips)
+        self._workers = []
+        self._sync = {}
+        self._stopping = threading.Event()
+        # Release the workers and shared memory even if close() is never called
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self.state, self._workers, self._sync, self._stopping)
+        self.state.strategy[:] = rng.permutation(labels).reshape(height, width)
+        self.state.moves[0] = rng.random((height, width)) < initial_cooperate_prob
+        self.state.scores[0] = 0
+
+        if processes:
+            self._start_workers(seeds[1:])
+        else:
+            self._rngs = [np.random.default_rng(s) for s in seeds[1:]]
+
+        self.model_vars = {name: [] for name in REPORTER_NAMES}
+        self.running = True
+        for index, (start, stop) in enumerate(self.bounds):
+            self.state.partials[index] = strip_partials(
+                self.state.moves[0], self.state.scores[0], self.state.strategy, start, stop)
+        self.collect()
+
+    def _start_workers(self, seeds):
+        ctx = mp.get_context()
+        self._command = self._sync["command"] = ctx.Value("b", _RUN, lock=False)
+        self._clock = ctx.Value("q", 0, lock=False)
+        self._start_barrier = self._sync["start_barrier"] = ctx.Barrier(self.n_strips + 1)
+        self._done_barrier = ctx.Barrier(self.n_strips + 1)
+        move_barrier = ctx.Barrier(self.n_strips)
+        for index, bounds in enumerate(self.bounds):
+            worker = ctx.Process(
+                target=_strip_worker,
+                args=(self.state.names, (self.height, self.width), self.n_strips, index,
+                      bounds, seeds[index], self.payoff_matrix, self._command, self._clock,
+                      self._start_barrier, move_barrier, self._done_barrier),
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+        threading.Thread(
+            target=_watch_workers,
+            args=(list(self._workers), [self._start_barrier, move_barrier, self._done_barrier],
+                  self._stopping),
+            daemon=True,
+        ).start()
+
+    # The accessors return copies: close() unmaps the shared memory, and a view
+    # into it would crash the interpreter on the next read.
+    @property
+    def moves(self):
+        """Copy of the current moves of the whole lattice (1 = C, 0 = D)."""
+        return self.state.moves[self.steps % 2].copy()
+
+    @property
+    def scores(self):
+        """Copy of the current cumulative scores of the whole lattice."""
+        return self.state.scores[self.steps % 2].copy()
+
+    @property
+    def strategy(self):
+        """Copy of the strategy codes of the whole lattice."""
+        return self.state.strategy.copy()
+
+    def collect(self):
+        """
+        Reduce the per-strip partial sums into one row of model reporters.
+        """
+        totals = self.state.partials.sum(axis=0)
+        n = len(STRATEGIES)
+        counts, score_sums, cooperating = totals[:n], totals[n:2 * n], totals[-1]
+        averages = [s / c if c else 0 for s, c in zip(score_sums, counts)]
+        row = [int(c) for c in counts] + averages + [
+            self.width * self.height - int(cooperating), int(cooperating)]
+        for name, value in zip(REPORTER_NAMES, row):
+            self.model_vars[name].append(value)
+        return int(cooperating)
+
+    def get_model_vars_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.model_vars)
+
+    def step(self):
+        """
+        Advance every strip by one step.
+
+        Raises threading.BrokenBarrierError if a worker failed or died.
+        """
+        if self._workers:
+            self._clock.value = self.steps
+            self._start_barrier.wait()
+            self._done_barrier.wait()
+        else:
+            # The move phase of every strip must finish before any payoff phase.
+            for (start, stop), rng in zip(self.bounds, self._rngs):
+                _move_phase(self.state, self.steps, start, stop, rng)
+            for index, (start, stop) in enumerate(self.bounds):
+                _payoff_phase(self.state, self.steps, index, start, stop, self.payoff_matrix)
+        self.steps += 1
+        cooperating = self.collect()
+
+        # Stop the model if all agents are either cooperating or defecting
+        if cooperating in (0, self.width * self.height):
+            self.running = False
+
+    def run(self, n):
+        """Run the model for n steps."""
+        for _ in range(n):
+            self.step()
+
+    def close(self):
+        """Stop the worker processes and release the shared memory."""
+        self._finalizer()
+        self.state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
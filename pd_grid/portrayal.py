@@ -20,5 +20,5 @@ def portrayPDAgent(agent):
         "Layer": 0,
         "x": agent.pos[0],
         "y": agent.pos[1],
-        "Color": "blue" if agent.is_cooperating else "red",
+        "Color": "blue" if agent.move == "C" else "red",
     }
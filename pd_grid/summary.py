@@ -0,0 +1,148 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Columns that identify one parameter cell of the sweep in batchrun.py
+PARAMETERS = ["initial_cooperate_prob", "payoff_CC", "payoff_CD", "payoff_DC", "payoff_DD",
+              "primary_ratio", "primary_strategy"]
+
+METRICS = ["Cooperation Share", "Average Score(Frequency Dependent)",
+           "Average Score(Success Base)", "Average Score(Random Copying)"]
+
+TABLES = ["final", "steps"]
+
+DEFAULT_PATH = "batch_run_summary"
+
+
+def _mean_ci(grouped):
+    """
+    Mean, 95% confidence half-width and number of runs for each group.
+    """
+    stats = grouped.agg(["mean", "std", "count"])
+    stats["ci"] = 1.96 * stats["std"] / np.sqrt(stats["count"])
+    return stats[["mean", "ci", "count"]].rename(columns={"count": "n"})
+
+
+def step_grid(max_steps, data_collection_period=-1):
+    """
+    The steps SweepPool and batch_run collect for a run that does not stop early.
+
+    Parameters:
+    max_steps (int): The max_steps of the batch run.
+    data_collection_period (int): Steps between collected rows, -1 for the last step only.
+    """
+    steps = set(range(0, max_steps + 1, data_collection_period)) if data_collection_period > 0 else set()
+    return sorted(steps | {max_steps})
+
+
+def _on_grid(df, grid, fill_missing_steps):
+    """
+    The cooperation share of every run at the steps in grid.
+
+    Rows off the grid, such as the last step of a run that stopped early, are dropped.
+    With fill_missing_steps, a run that stopped early keeps its final cooperation share
+    at every later step of the grid, so that every run contributes to every step.
+    """
+    runs = ["RunId", "iteration"]
+    last = df.groupby(runs).tail(1).set_index(runs)
+    shares = (
+        df[df["Step"].isin(grid)]
+        .pivot(index=runs, columns="Step", values="Cooperation Share")
+        .reindex(index=last.index, columns=grid)
+    )
+    if fill_missing_steps:
+        # Only fill steps after a run's last row, not the steps it skipped between collections
+        ended = np.asarray(grid)[None, :] > last["Step"].values[:, None]
+        final = last["Cooperation Share"].values[:, None]
+        shares[:] = np.where(ended, final, shares.values)
+    return shares.rename_axis(columns="Step").stack().dropna().rename("Cooperation Share").reset_index()
+
+
+def summarize(results, path=DEFAULT_PATH, fill_missing_steps=True, max_steps=None,
+              data_collection_period=-1):
+    """
+    Write the summary tables of a batch run to parquet files in path.
+
+    final.parquet holds the mean and 95% CI of each metric at the last step of each run,
+    one row per parameter cell and metric. steps.parquet holds the mean and 95% CI of the
+    cooperation share at every step of the collection grid (see step_grid) for each
+    parameter cell. Both are sorted by the parameters so that load_summary only reads the
+    row groups it needs.
+
+    Parameters:
+    results (list or DataFrame): The rows returned by batch_run or SweepPool.run.
+    path (str): Directory to write the tables to.
+    fill_missing_steps (bool): Carry runs that stopped early forward to the last step.
+    max_steps (int, optional): The max_steps of the batch run. Defaults to the steps
+        collected for the longest run.
+    data_collection_period (int): The data_collection_period of the batch run.
+
+    Returns:
+    dict: The summary DataFrames by table name.
+    """
+    df = pd.DataFrame(results)
+    df["Cooperation Share"] = df["Cooperating Agents"] / (df["Cooperating Agents"] + df["Defecting Agents"])
+    df = df.sort_values(["RunId", "iteration", "Step"])
+    # Parameters that were held fixed in the sweep are not in the rows
+    parameters = [name for name in PARAMETERS if name in df.columns]
+
+    last_steps = df.groupby(["RunId", "iteration"]).tail(1)
+    final = (
+        last_steps.melt(id_vars=parameters, value_vars=METRICS, var_name="metric")
+        .groupby(parameters + ["metric"])["value"]
+    )
+    final = _mean_ci(final).reset_index()
+
+    if max_steps is None:
+        longest = df.loc[df["Step"].idxmax(), ["RunId", "iteration"]]
+        grid = sorted(df.loc[(df["RunId"] == longest["RunId"])
+                             & (df["iteration"] == longest["iteration"]), "Step"])
+    else:
+        grid = step_grid(max_steps, data_collection_period)
+    shares = _on_grid(df, grid, fill_missing_steps)
+    shares = shares.merge(last_steps[["RunId", "iteration"] + parameters], on=["RunId", "iteration"])
+    steps = _mean_ci(shares.groupby(parameters + ["Step"])["Cooperation Share"]).reset_index()
+
+    tables = {"final": final, "steps": steps}
+    os.makedirs(path, exist_ok=True)
+    for name, table in tables.items():
+        table.to_parquet(os.path.join(path, f"{name}.parquet"), index=False,
+                         row_group_size=4096)
+    return tables
+
+
+def load_summary(table="final", path=DEFAULT_PATH, columns=None, **parameters):
+    """
+    Load a slice of a summary table without touching the raw batch run data.
+
+    Parameters:
+    table (str): "final" or "steps".
+    path (str): Directory the tables were written to by summarize.
+    columns (list, optional): Columns to read. Defaults to all of them.
+    **parameters: Values to select, e.g. primary_strategy="Random Copying" or
+        metric="Cooperation Share". A list selects any of its values.
+
+    Returns:
+    DataFrame: The matching rows.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown summary table {table!r}, expected one of {TABLES}.")
+    filters = [
+        (name, "in", list(value)) if isinstance(value, (list, tuple)) else (name, "==", value)
+        for name, value in parameters.items()
+    ]
+    return pd.read_parquet(os.path.join(path, f"{table}.parquet"), columns=columns,
+                           filters=filters or None)
+
+
+if __name__ == "__main__":
+    # Build the summary tables from an existing batch run CSV, e.g.
+    # python -m pd_grid.summary batch_run_results_2.csv batch_run_summary 50 5
+    # with the max_steps and data_collection_period of the batch run
+    raw = pd.read_csv(sys.argv[1], index_col=0)
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+    max_steps = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    period = int(sys.argv[4]) if len(sys.argv) > 4 else -1
+    summarize(raw, path, max_steps=max_steps, data_collection_period=period)
@@ -0,0 +1,187 @@
+import importlib
+import itertools
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import time
+
+# Set once per worker process by _init_worker and reused by every task it runs.
+_worker = {}
+
+COLD_START_SCRIPT = "from pd_grid.model import PdGrid; PdGrid().step()"
+
+
+def _load(model_path):
+    """
+    Import a model class from a "package.module:ClassName" path.
+    """
+    module_name, class_name = model_path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _make_model_kwargs(parameters):
+    """
+    Every combination of the parameter values, in mesa.batchrunner.batch_run's order.
+
+    A string or a non-iterable value is a single value, anything else is iterated.
+    """
+    parameter_list = []
+    for param, values in parameters.items():
+        if isinstance(values, str):
+            all_values = [(param, values)]
+        else:
+            try:
+                all_values = [(param, value) for value in values]
+            except TypeError:
+                all_values = [(param, values)]
+        parameter_list.append(all_values)
+    return [dict(kwargs) for kwargs in itertools.product(*parameter_list)]
+
+
+def _model_run_func(model_cls, run, max_steps, data_collection_period):
+    """
+    Run one model and return its collected rows in mesa.batchrunner.batch_run's format.
+
+    Vendored from mesa 2.4 so that the sweep does not depend on mesa's private
+    helpers, keeping its step bounds: the model runs while model.running for at most
+    max_steps + 1 steps, and rows are taken every data_collection_period steps plus
+    the last one.
+    """
+    run_id, iteration, kwargs = run
+    model = model_cls(**kwargs)
+    n_steps = 0
+    while model.running and n_steps <= max_steps:
+        model.step()
+        n_steps += 1
+
+    steps = list(range(0, n_steps, data_collection_period))
+    if not steps or steps[-1] != n_steps - 1:
+        steps.append(n_steps - 1)
+
+    dc = model.datacollector
+    agent_vars = dc.get_agent_vars_dataframe() if dc.agent_reporters else None
+    data = []
+    for step in steps:
+        row = {"RunId": run_id, "iteration": iteration, "Step": step, **kwargs}
+        row.update({name: values[step] for name, values in dc.model_vars.items()})
+        if agent_vars is None:
+            data.append(row)
+        elif step in agent_vars.index.get_level_values("Step"):
+            # One row per agent, as batch_run does when there are agent reporters
+            for agent_id, agent_data in agent_vars.xs(step, level="Step").iterrows():
+                data.append({**row, "AgentID": agent_id, **agent_data.to_dict()})
+    return data
+
+
+def _init_worker(model_path, max_steps, data_collection_period):
+    """
+    Import the model once when a worker process starts.
+    """
+    _worker["model_cls"] = _load(model_path)
+    _worker["max_steps"] = max_steps
+    _worker["data_collection_period"] = data_collection_period
+
+
+def _run_task(run):
+    return _model_run_func(
+        _worker["model_cls"], run,
+        max_steps=_worker["max_steps"],
+        data_collection_period=_worker["data_collection_period"],
+    )
+
+
+class SweepPool:
+    def __init__(self, model_path="pd_grid.model:PdGrid", number_processes=None,
+                 max_steps=1000, data_collection_period=-1):
+        """
+        A pool of worker processes that stays alive across several parameter sweeps.
+
+        Each worker imports the model and mesa once at startup. After that, a task
+        only sends its (run id, iteration, kwargs) tuple. The rows returned have
+        the same format as mesa.batchrunner.batch_run.
+
+        Parameters:
+        model_path (str): The model class as "package.module:ClassName".
+        number_processes (int, optional): Number of workers. Defaults to all CPUs.
+        max_steps (int): Maximum number of model steps for each run.
+        data_collection_period (int): Steps between collected rows, -1 for the last step only.
+        """
+        self.number_processes = number_processes or os.cpu_count()
+        self.pool = mp.get_context().Pool(
+            self.number_processes,
+            initializer=_init_worker,
+            initargs=(model_path, max_steps, data_collection_period),
+        )
+
+    def run(self, parameters, iterations=1, chunksize=None):
+        """
+        Run every combination of parameters for the given number of iterations.
+
+        Parameters:
+        parameters (dict): Single values or iterables for each model parameter.
+        iterations (int): Number of iterations for each parameter combination.
+        chunksize (int, optional): Runs sent to a worker at a time. By default
+            each worker gets about four chunks.
+
+        Returns:
+        list: One dictionary per collected step, as returned by batch_run.
+        """
+        runs_list = []
+        run_id = 0
+        for iteration in range(iterations):
+            for kwargs in _make_model_kwargs(parameters):
+                runs_list.append((run_id, iteration, kwargs))
+                run_id += 1
+
+        if chunksize is None:
+            chunksize = max(1, len(runs_list) // (4 * self.number_processes))
+
+        results = []
+        for data in self.pool.imap_unordered(_run_task, runs_list, chunksize=chunksize):
+            results.extend(data)
+        return results
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        """Stop the workers without waiting for the queued runs."""
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # On an error, don't wait for the rest of the sweep, as mesa.batch_run doesn't
+        if exc[0] is not None:
+            self.terminate()
+        else:
+            self.close()
+
+
+def cold_start_time(repeats=5, script=COLD_START_SCRIPT):
+    """
+    Time a bare model run in a fresh interpreter, imports included.
+
+    Parameters:
+    repeats (int): Number of fresh interpreters to launch.
+    script (str): The code each interpreter runs.
+
+    Returns:
+    float: The fastest wall-clock time in seconds.
+    """
+    # Run from the repository root so the fresh interpreter can import pd_grid.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], cwd=root, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    print(f"Cold start (import + PdGrid() + one step): {cold_start_time():.2f}s")
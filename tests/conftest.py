@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The packages are not installed; import them from the repository root and the
+# Final Project directory.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Final Project"))
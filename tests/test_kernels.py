@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from pd_grid import kernels
+from pd_grid.model import PdGrid
+
+NUMBA = pytest.param("numba", marks=pytest.mark.skipif(
+    "numba" not in kernels.BACKENDS, reason="numba is not installed"))
+
+
+@pytest.fixture
+def model():
+    return PdGrid(primary_ratio=0.4, primary_strategy="Success Base Learning")
+
+
+def columns(model):
+    agents = list(model.schedule.agents)
+    strategy = np.array([kernels.STRATEGY_CODES[a.strategy] for a in agents], dtype=np.int8)
+    moves = np.array([kernels.MOVE_CODES[a.move] for a in agents], dtype=np.int8)
+    payoff_matrix = np.asarray(list(model.payoff_matrix.values()), dtype=np.float64)
+    return agents, kernels.neighbour_csr(agents, model.grid), strategy, moves, payoff_matrix
+
+
+def run(moves_kernel, payoffs_kernel, csr, strategy, moves, payoff_matrix, draws):
+    scores = np.zeros(len(moves))
+    for step_draws in draws:
+        moves = moves_kernel(*csr, strategy, moves, scores, step_draws)
+        scores = scores + payoffs_kernel(*csr, moves, payoff_matrix)
+    return moves, scores
+
+
+@pytest.mark.parametrize("backend", [NUMBA, "numpy"])
+def test_backend_matches_loops(model, backend):
+    agents, csr, strategy, moves, payoff_matrix = columns(model)
+    draws = np.random.default_rng(0).random((20, len(agents)))
+
+    expected = run(kernels._next_moves_loop, kernels._payoffs_loop,
+                   csr, strategy, moves, payoff_matrix, draws)
+    got = run(*kernels._kernels(backend), csr, strategy, moves, payoff_matrix, draws)
+
+    assert np.array_equal(got[0], expected[0])
+    assert np.allclose(got[1], expected[1])
+
+
+@pytest.mark.parametrize("backend", [NUMBA, "numpy"])
+def test_success_base_matches_pdagent(model, backend):
+    agents, csr, strategy, moves, _ = columns(model)
+    rng = np.random.default_rng(0)
+    # Few distinct scores, so that ties must be broken in mesa's neighbourhood order
+    scores = rng.integers(0, 3, len(agents)).astype(np.float64)
+    for agent, score in zip(agents, scores):
+        agent.score = score
+
+    expected = []
+    for agent in agents:
+        before = agent.move
+        agent.success_base_learning()
+        expected.append(kernels.MOVE_CODES[agent.move])
+        agent.move = before
+
+    got = kernels.next_moves(*csr, strategy, moves, scores, rng.random(len(agents)), backend)
+    success = strategy == kernels.STRATEGY_CODES["Success Base Learning"]
+    assert np.array_equal(got[success], np.array(expected)[success])
+
+
+def test_resolve_backend():
+    assert kernels.resolve_backend("auto") == kernels.BACKENDS[0]
+    assert kernels.resolve_backend("numpy") == "numpy"
+    with pytest.raises(ValueError):
+        kernels.resolve_backend("cuda")
+
+
+def test_strategy_counts():
+    counts = kernels.strategy_counts(2500, 0.53, "Success Base Learning")
+    assert list(counts) == list(kernels.STRATEGY_CODES)
+    assert counts == {"Frequency Dependent Learning": 587, "Success Base Learning": 1325,
+                      "Random Copying": 588}
+    with pytest.raises(ValueError):
+        kernels.strategy_counts(2500, 0.5, "Tit for Tat")
@@ -0,0 +1,120 @@
+import gc
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from pd_grid import kernels
+from pd_grid.model import PdGrid
+from pd_grid.parallel import (FREQUENCY_DEPENDENT, RANDOM_COPYING, SUCCESS_BASE, ParallelPdGrid,
+                              payoffs, strip_bounds, update_moves)
+
+
+def lattice(model):
+    """Moves, scores and strategy codes of a PdGrid as [y, x] arrays."""
+    shape = (model.grid.height, model.grid.width)
+    moves, scores, strategy = np.zeros(shape, np.int8), np.zeros(shape), np.zeros(shape, np.int8)
+    for agent in model.schedule.agents:
+        x, y = agent.pos
+        moves[y, x] = kernels.MOVE_CODES[agent.move]
+        scores[y, x] = agent.score
+        strategy[y, x] = kernels.STRATEGY_CODES[agent.strategy]
+    return moves, scores, strategy
+
+
+def test_strips_match_pdgrid_kernel_step():
+    model = PdGrid(kernel_backend="numpy")
+    rng = np.random.default_rng(1)
+    for agent in model.schedule.agents:
+        agent.score = float(rng.integers(0, 3))
+    moves, scores, strategy = lattice(model)
+
+    # A single strip draws its [y, x] lattice of uniforms in one go; hand the same
+    # draws to the kernel in agent order.
+    draws = np.random.default_rng(2).random(moves.shape)
+    strip_moves = update_moves(moves, scores, strategy, 0, moves.shape[0], np.random.default_rng(2))
+    agents = list(model.schedule.agents)
+    csr = kernels.neighbour_csr(agents, model.grid)
+    kernel_moves = kernels.next_moves(
+        *csr, np.array([strategy[a.pos[1], a.pos[0]] for a in agents]),
+        np.array([moves[a.pos[1], a.pos[0]] for a in agents]),
+        np.array([scores[a.pos[1], a.pos[0]] for a in agents]),
+        np.array([draws[a.pos[1], a.pos[0]] for a in agents]), "numpy")
+    assert all(strip_moves[a.pos[1], a.pos[0]] == m for a, m in zip(agents, kernel_moves))
+
+    payoff_matrix = tuple(model.payoff_matrix.values())
+    kernel_payoffs = kernels.payoffs(*csr, kernel_moves, payoff_matrix, "numpy")
+    strip_payoffs = payoffs(strip_moves, 0, moves.shape[0], payoff_matrix)
+    assert all(strip_payoffs[a.pos[1], a.pos[0]] == p for a, p in zip(agents, kernel_payoffs))
+
+
+def test_success_base_ties_copy_first_neighbour():
+    # With all scores equal PDAgent copies the (x - 1, y - 1) neighbour
+    moves = np.zeros((5, 5), np.int8)
+    moves[1, 1] = 1
+    strategy = np.full((5, 5), kernels.STRATEGY_CODES["Success Base Learning"], np.int8)
+    next_moves = update_moves(moves, np.zeros((5, 5)), strategy, 0, 5, np.random.default_rng(0))
+    assert next_moves[2, 2] == 1
+    assert next_moves[1, 1] == 0
+
+
+def test_processes_match_in_process_run():
+    results = []
+    for processes in (False, True):
+        with ParallelPdGrid(width=30, height=20, n_strips=3, processes=processes, seed=4) as model:
+            model.run(5)
+            results.append((model.moves, model.scores, model.model_vars))
+    assert np.array_equal(results[0][0], results[1][0])
+    assert np.array_equal(results[0][1], results[1][1])
+    assert results[0][2] == results[1][2]
+
+
+def test_dead_worker_breaks_step():
+    with ParallelPdGrid(width=20, height=20, n_strips=2, seed=0) as model:
+        model.step()
+        model._workers[0].kill()
+        with pytest.raises(threading.BrokenBarrierError):
+            model.step()
+
+
+def test_shared_memory_released_without_close():
+    model = ParallelPdGrid(width=20, height=20, n_strips=2, seed=0)
+    model.step()
+    names = list(model.state.names.values())
+    workers = list(model._workers)
+    del model
+    gc.collect()
+    assert not any(worker.is_alive() for worker in workers)
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_lattice_arrays_outlive_the_model():
+    with ParallelPdGrid(width=20, height=20, n_strips=2, processes=False, seed=0) as model:
+        model.run(2)
+        moves, scores = model.moves, model.scores
+        expected = moves.sum(), scores.sum()
+    assert (moves.sum(), scores.sum()) == expected
+
+    strategy = ParallelPdGrid(width=20, height=20, n_strips=2, processes=False, seed=0).strategy
+    gc.collect()
+    assert np.isin(strategy, [FREQUENCY_DEPENDENT, SUCCESS_BASE, RANDOM_COPYING]).all()
+
+
+def test_reporters_match_pdgrid():
+    pd_model = PdGrid(primary_ratio=0.53, primary_strategy="Random Copying")
+    with ParallelPdGrid(primary_ratio=0.53, primary_strategy="Random Copying", n_strips=2,
+                        processes=False, seed=0) as model:
+        expected = pd_model.datacollector.get_model_vars_dataframe().iloc[0]
+        got = model.get_model_vars_dataframe().iloc[0]
+    assert list(got.index) == list(expected.index)
+    counts = list(kernels.COUNT_REPORTERS.values())
+    assert got[counts].tolist() == expected[counts].tolist()
+
+
+def test_strip_bounds_cover_every_row():
+    bounds = strip_bounds(10, 3)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
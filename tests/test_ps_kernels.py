@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from ps import kernels
+from ps.model import ParentalLearningModel
+
+NUMBA = pytest.param("numba", marks=pytest.mark.skipif(
+    "numba" not in kernels.BACKENDS, reason="numba is not installed"))
+
+
+@pytest.fixture
+def model():
+    model = ParentalLearningModel(width=20, height=20, kernel_backend="numpy",
+                                  high_individual_learning_ratio=0.2,
+                                  medium_individual_learning_ratio=0.2,
+                                  low_individual_learning_ratio=0.2,
+                                  high_primary_social_ratio=0.4,
+                                  medium_primary_social_ratio=0.4,
+                                  low_primary_social_ratio=0.4)
+    model.schedule.build_columns()
+    rng = np.random.default_rng(0)
+    for agent in model.schedule.columns["agents"]:
+        agent.time_investment = float(rng.integers(20, 60))
+    return model
+
+
+def arguments(model):
+    columns = model.schedule.columns
+    return (*columns["neighbours"], columns["level"]), (
+        float(model.optimal_time_investment), columns["thresholds"],
+        columns["switch_probabilities"], columns["cum_weights"])
+
+
+def run(stepper, model, draws):
+    head, parameters = arguments(model)
+    agents = model.schedule.columns["agents"]
+    strategy = np.array([kernels.STRATEGY_CODES[a.strategy] for a in agents], dtype=np.int8)
+    time_investment = np.array([a.time_investment for a in agents])
+    score = np.zeros(len(agents))
+    for step_draws in draws:
+        time_investment, score, strategy = stepper(
+            *head, strategy, time_investment, score, *parameters, step_draws)
+    return time_investment, score, strategy
+
+
+@pytest.mark.parametrize("backend", [NUMBA, "numpy"])
+def test_backend_matches_loop(model, backend):
+    draws = np.random.default_rng(1).random((20, 3, len(model.schedule.columns["agents"])))
+
+    expected = run(kernels._parent_step_loop, model, draws)
+    got = run(kernels._kernel(backend), model, draws)
+
+    for got_column, expected_column in zip(got, expected):
+        assert np.array_equal(got_column, expected_column)
+
+
+@pytest.mark.parametrize("backend", [NUMBA, "numpy"])
+def test_highest_scoring_matches_parent_agent(model, backend):
+    agents = model.schedule.columns["agents"]
+    rng = np.random.default_rng(2)
+    # Few distinct scores, so that ties must be broken in mesa's neighbour order
+    score = rng.choice([0.0, 10.0, 20.0], len(agents))
+    time_investment = np.array([a.time_investment for a in agents])
+    for agent, s in zip(agents, score):
+        agent.child_outcome_score = float(s)
+
+    expected = []
+    for agent in agents:
+        before = agent.time_investment
+        agent.copy_highest_scoring_neighbor()
+        expected.append(agent.time_investment)
+        agent.time_investment = before
+
+    head, parameters = arguments(model)
+    highest = np.full(len(agents), kernels.STRATEGY_CODES["Copying the highest-scoring neighbor"],
+                      dtype=np.int8)
+    # Draws of one never switch strategy
+    no_switch = np.ones((3, len(agents)))
+    got = kernels.parent_step(*head, highest, time_investment, score, *parameters, no_switch,
+                              backend)[0]
+    assert np.array_equal(got, expected)
@@ -0,0 +1,49 @@
+import pytest
+
+from pd_grid.summary import METRICS, load_summary, step_grid, summarize
+
+
+def rows(run_id, steps, cooperators, primary_ratio=0.5):
+    """Batch run rows for one run of 10 agents."""
+    return [
+        {"RunId": run_id, "iteration": 0, "Step": step, "primary_ratio": primary_ratio,
+         "Cooperating Agents": c, "Defecting Agents": 10 - c, **{metric: 1.0 for metric in METRICS[1:]}}
+        for step, c in zip(steps, cooperators)
+    ]
+
+
+def test_step_grid_matches_collected_steps():
+    assert step_grid(12, 5) == [0, 5, 10, 12]
+    assert step_grid(50, 5) == list(range(0, 51, 5))
+    assert step_grid(50, -1) == [50]
+
+
+@pytest.mark.parametrize("max_steps", [12, None])
+def test_early_stopped_runs_are_carried_on_the_grid(tmp_path, max_steps):
+    # Run 1 stopped at step 7, off the collection grid
+    results = rows(0, [0, 5, 10, 12], [5, 5, 5, 5]) + rows(1, [0, 5, 7], [1, 3, 9])
+    steps = summarize(results, tmp_path, max_steps=max_steps, data_collection_period=5)["steps"]
+
+    assert steps["Step"].tolist() == [0, 5, 10, 12]
+    assert steps["n"].tolist() == [2, 2, 2, 2]
+    assert steps["mean"].tolist() == pytest.approx([0.3, 0.4, 0.7, 0.7])
+
+
+def test_off_grid_steps_dropped_without_filling(tmp_path):
+    results = rows(0, [0, 5, 10, 12], [5, 5, 5, 5]) + rows(1, [0, 5, 7], [1, 3, 9])
+    steps = summarize(results, tmp_path, fill_missing_steps=False, max_steps=12,
+                      data_collection_period=5)["steps"]
+
+    assert steps["Step"].tolist() == [0, 5, 10, 12]
+    assert steps["n"].tolist() == [2, 2, 1, 1]
+
+
+def test_load_summary_filters_cells(tmp_path):
+    results = rows(0, [0, 5], [2, 4], primary_ratio=0.2) + rows(1, [0, 5], [6, 8], primary_ratio=0.8)
+    summarize(results, tmp_path, max_steps=5, data_collection_period=5)
+
+    final = load_summary("final", tmp_path, primary_ratio=0.8, metric="Cooperation Share")
+    assert final["mean"].tolist() == pytest.approx([0.8])
+    assert len(load_summary("steps", tmp_path, primary_ratio=[0.2, 0.8])) == 4
+    with pytest.raises(ValueError):
+        load_summary("runs", tmp_path)
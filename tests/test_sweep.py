@@ -0,0 +1,39 @@
+import time
+
+import mesa
+import pytest
+
+from pd_grid.sweep import SweepPool
+
+
+class SlowModel(mesa.Model):
+    """A model whose runs take half a second, or that fails on construction."""
+
+    def __init__(self, fail=False):
+        super().__init__()
+        if fail:
+            raise RuntimeError("bad parameter cell")
+        self.datacollector = mesa.DataCollector(model_reporters={"Failed": lambda m: False})
+
+    def step(self):
+        time.sleep(0.5)
+        self.datacollector.collect(self)
+        self.running = False
+
+
+def test_sweep_rows():
+    with SweepPool(model_path="pd_grid.model:PdGrid", number_processes=2, max_steps=3,
+                   data_collection_period=2) as pool:
+        results = pool.run({"primary_ratio": [0.2, 0.8]}, iterations=2)
+    assert sorted((row["RunId"], row["Step"]) for row in results) == [
+        (run, step) for run in range(4) for step in (0, 2, 3)]
+    assert {row["primary_ratio"] for row in results if row["RunId"] in (1, 3)} == {0.8}
+
+
+def test_failing_run_stops_the_sweep():
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="bad parameter cell"):
+        with SweepPool(model_path=f"{__name__}:SlowModel", number_processes=2, max_steps=0) as pool:
+            pool.run({"fail": [True] + [False] * 39}, chunksize=1)
+    # Finishing the other 39 runs would take about 10 s
+    assert time.perf_counter() - start < 5